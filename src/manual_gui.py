@@ -4,25 +4,56 @@ manual_gui.py
 
 GUI control panel for AeroVision stepper rig.
 Allows manual jogging of X and Z axes, emergency stop that immediately releases motors,
-home (aesthetic), loading of CSV waypoint files, and dynamic step-size selection.
+home (aesthetic), loading and playback of CSV waypoint files, and dynamic step-size selection.
 """
 import tkinter as tk
 from tkinter import filedialog, messagebox
 import os
+import queue
+import numpy as np
 
 # Import the motor controller
-from motor_controller import MotorController
+from motor_controller import SyncXMotorController
+
+# Rapid jog clicks are merged over this window (ms) and while a move is running
+JOG_COALESCE_MS = 30
+# Upper bound on accumulated, not-yet-sent jog distance per axis (mm)
+MAX_PENDING_JOG_MM = 100.0
+# Position readout refresh period (ms), ~30 Hz
+UPDATE_INTERVAL_MS = 33
 
 class ManualControlApp(tk.Tk):
     def __init__(self):
         super().__init__()
         self.title("AeroVision Manual Control")
-        self.mc = MotorController()
+        self.mc = SyncXMotorController()
         self.csv_path = None
+        # Loaded CSV path: (N, 2) array of (x_mm, z_mm) and per-segment step counts
+        self.waypoints = None
+        self._plan_sx = None
+        self._plan_sz = None
         self.estopped = False
         # Variable for dynamic step size
         self.step_size = tk.DoubleVar(value=1.0)
+        # Microsteps per jog click, recomputed only when the step size changes
+        self._x_steps_per_jog = 0
+        self._z_steps_per_jog = 0
+        self._jog_steps_var = tk.StringVar()
+        self._recompute_step_counts()
+        self.step_size.trace_add("write", self._recompute_step_counts)
+        # Jog microsteps accumulated from clicks but not yet sent to the controller
+        self._pending_dx = 0
+        self._pending_dz = 0
+        self._flush_id = None
+        # Position readouts; last shown text is cached to skip no-op redraws
+        self._x_var = tk.StringVar()
+        self._z_var = tk.StringVar()
+        self._last_x = None
+        self._last_z = None
         self._create_widgets()
+        self._update_position()
+        # Motion runs on the controller's worker thread; poll its position and results here
+        self.after(UPDATE_INTERVAL_MS, self._poll)
 
     def _create_widgets(self):
         # Step size selector
@@ -37,20 +68,20 @@ class ManualControlApp(tk.Tk):
             textvariable=self.step_size,
             width=5
         ).pack(side=tk.LEFT, padx=(5,0))
+        tk.Label(step_frame, textvariable=self._jog_steps_var).pack(side=tk.LEFT, padx=(5,0))
 
         # X axis controls
         x_frame = tk.LabelFrame(self, text="X Axis", padx=10, pady=10)
         x_frame.grid(row=1, column=0, padx=10, pady=10)
         btn_left = tk.Button(
             x_frame, text="◀", width=4,
-            command=lambda: self._move_x(-self.step_size.get())
+            command=lambda: self._move_x(-1)
         )
         btn_left.grid(row=0, column=0)
-        self.lbl_x = tk.Label(x_frame, text=f"X = {self.mc.position['x']:.2f} mm")
-        self.lbl_x.grid(row=0, column=1, padx=5)
+        tk.Label(x_frame, textvariable=self._x_var).grid(row=0, column=1, padx=5)
         btn_right = tk.Button(
             x_frame, text="▶", width=4,
-            command=lambda: self._move_x(self.step_size.get())
+            command=lambda: self._move_x(1)
         )
         btn_right.grid(row=0, column=2)
 
@@ -59,14 +90,13 @@ class ManualControlApp(tk.Tk):
         z_frame.grid(row=1, column=1, padx=10, pady=10)
         btn_up = tk.Button(
             z_frame, text="▲", width=4,
-            command=lambda: self._move_z(self.step_size.get())
+            command=lambda: self._move_z(1)
         )
         btn_up.grid(row=0, column=1)
-        self.lbl_z = tk.Label(z_frame, text=f"Z = {self.mc.position['z']:.2f} mm")
-        self.lbl_z.grid(row=1, column=1, pady=5)
+        tk.Label(z_frame, textvariable=self._z_var).grid(row=1, column=1, pady=5)
         btn_down = tk.Button(
             z_frame, text="▼", width=4,
-            command=lambda: self._move_z(-self.step_size.get())
+            command=lambda: self._move_z(-1)
         )
         btn_down.grid(row=2, column=1)
 
@@ -83,75 +113,173 @@ class ManualControlApp(tk.Tk):
             command=self._emergency_stop
         )
         btn_estop.grid(row=0, column=1, padx=5)
+        self.btn_clear = tk.Button(
+            ctrl_frame, text="Clear E-STOP", width=10,
+            command=self._clear_estop
+        )
+        self.btn_clear.grid(row=0, column=4, padx=5)
         btn_load = tk.Button(
             ctrl_frame, text="Load CSV", width=8,
             command=self._load_csv
         )
         btn_load.grid(row=0, column=2, padx=5)
+        btn_run = tk.Button(
+            ctrl_frame, text="Run CSV", width=8,
+            command=self._run_csv
+        )
+        btn_run.grid(row=0, column=3, padx=5)
         self.lbl_csv = tk.Label(
             ctrl_frame, text="No file loaded", anchor="w"
         )
-        self.lbl_csv.grid(row=1, column=0, columnspan=3, pady=(5,0), sticky="we")
+        self.lbl_csv.grid(row=1, column=0, columnspan=5, pady=(5,0), sticky="we")
 
-    def _move_x(self, distance):
+    def _recompute_step_counts(self, *_):
+        try:
+            mm = self.step_size.get()
+        except tk.TclError:
+            # Spinbox text is mid-edit and not a number yet; keep the old counts
+            return
+        self._x_steps_per_jog = int(round(mm * self.mc.steps_per_mm_x))
+        self._z_steps_per_jog = int(round(mm * self.mc.steps_per_mm_z))
+        self._jog_steps_var.set(f"= {self._x_steps_per_jog} X / {self._z_steps_per_jog} Z steps")
+
+    def _move_x(self, sign):
         if self.estopped:
             return
-        try:
-            self.mc.move_x(distance)
-            self._update_position()
-        except Exception as e:
-            messagebox.showerror("Error", f"X axis move failed: {e}")
+        limit = int(MAX_PENDING_JOG_MM * self.mc.steps_per_mm_x)
+        self._pending_dx = self._clamp_jog(self._pending_dx + sign * self._x_steps_per_jog, limit)
+        self._schedule_flush()
 
-    def _move_z(self, distance):
+    def _move_z(self, sign):
         if self.estopped:
             return
+        limit = int(MAX_PENDING_JOG_MM * self.mc.steps_per_mm_z)
+        self._pending_dz = self._clamp_jog(self._pending_dz + sign * self._z_steps_per_jog, limit)
+        self._schedule_flush()
+
+    @staticmethod
+    def _clamp_jog(steps, limit):
+        return max(-limit, min(limit, steps))
+
+    def _schedule_flush(self):
+        if self._flush_id is None:
+            self._flush_id = self.after(JOG_COALESCE_MS, self._flush_jog)
+
+    def _flush_jog(self):
+        # Hold clicks back while a move is in flight so they merge into one
+        if self.mc.busy():
+            self._flush_id = self.after(JOG_COALESCE_MS, self._flush_jog)
+            return
+        self._flush_id = None
+        dx, self._pending_dx = self._pending_dx, 0
+        dz, self._pending_dz = self._pending_dz, 0
+        if dx:
+            self.mc.step_x_raw(dx)
+        if dz:
+            self.mc.step_z_raw(dz)
+
+    def _cancel_jog(self):
+        if self._flush_id is not None:
+            self.after_cancel(self._flush_id)
+            self._flush_id = None
+        self._pending_dx = 0
+        self._pending_dz = 0
+        self.mc.cancel_pending()
+
+    def _poll(self):
+        # Runs at a fixed rate on the Tk thread, however fast the motors step:
+        # redraw from the worker's live position, surface any move errors
+        self._update_position()
         try:
-            self.mc.move_z(distance)
-            self._update_position()
-        except Exception as e:
-            messagebox.showerror("Error", f"Z axis move failed: {e}")
+            while True:
+                kind, value = self.mc.updates.get_nowait()
+                if kind == "error":
+                    messagebox.showerror("Error", value)
+        except queue.Empty:
+            pass
+        self.after(UPDATE_INTERVAL_MS, self._poll)
 
     def _update_position(self):
-        x = self.mc.position['x']
-        z = self.mc.position['z']
-        self.lbl_x.config(text=f"X = {x:.2f} mm")
-        self.lbl_z.config(text=f"Z = {z:.2f} mm")
+        x, z = self.mc.live_position
+        text = f"X = {x:.2f} mm"
+        if text != self._last_x:
+            self._x_var.set(text)
+            self._last_x = text
+        text = f"Z = {z:.2f} mm"
+        if text != self._last_z:
+            self._z_var.set(text)
+            self._last_z = text
 
     def _home(self):
         if self.estopped:
             return
-        # Aesthetic only: reset displayed position
-        self.mc.position = {'x': 0.0, 'z': 0.0}
-        self._update_position()
+        # Aesthetic only: reset the tracked position once queued moves finish;
+        # the readout follows on the next _poll
+        self.mc.set_position(0.0, 0.0)
         messagebox.showinfo("Home", "Position reset to (0,0)")
 
     def _emergency_stop(self):
-        # Immediately release all motors
-        try:
-            for stepper in self.mc.steppers.values():
-                if stepper:
-                    stepper.release()
-        except Exception:
-            pass
+        # Drop not-yet-sent jogs, then stop the running move before its next
+        # step, drop everything queued and release all motors
+        self._cancel_jog()
+        self.mc.abort()
         # Disable further controls
         self.estopped = True
-        for child in self.winfo_children():
-            if isinstance(child, tk.Button) or isinstance(child, tk.Spinbox):
-                child.config(state=tk.DISABLED)
+        self._set_controls_state(tk.DISABLED)
         messagebox.showwarning("EMERGENCY STOP", "All controls disabled and motors released!")
 
+    def _clear_estop(self):
+        if not self.estopped:
+            return
+        self.mc.clear_abort()
+        self.estopped = False
+        self._set_controls_state(tk.NORMAL)
+
+    def _set_controls_state(self, state, parent=None):
+        # Walk nested frames; the Clear E-STOP button always stays usable
+        for child in (parent or self).winfo_children():
+            if child is self.btn_clear:
+                continue
+            if isinstance(child, (tk.Button, tk.Spinbox)):
+                child.config(state=state)
+            self._set_controls_state(state, child)
+
     def _load_csv(self):
         if self.estopped:
             return
         path = filedialog.askopenfilename(
             title="Select CSV file", filetypes=[("CSV Files", "*.csv")]
         )
-        if path:
-            fname = os.path.basename(path)
-            self.csv_path = path
-            self.lbl_csv.config(text=f"Loaded: {fname}")
-        else:
+        if not path:
             self.lbl_csv.config(text="No file loaded")
+            return
+        # Parse once (header row, x_mm and z_mm in the first two columns)
+        # and plan per-segment step counts now, so playback only pulses
+        try:
+            arr = np.loadtxt(path, delimiter=",", skiprows=1, usecols=(0, 1), ndmin=2)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Could not load CSV: {e}")
+            return
+        if len(arr) == 0:
+            messagebox.showerror("Error", "CSV contains no waypoints")
+            return
+        # Round absolute positions, then difference, so rounding does not accumulate
+        steps = np.rint(arr * (self.mc.steps_per_mm_x, self.mc.steps_per_mm_z)).astype(np.int32)
+        seg = np.diff(steps, axis=0)
+        self.waypoints = arr
+        self._plan_sx = seg[:, 0]
+        self._plan_sz = seg[:, 1]
+        self.csv_path = path
+        fname = os.path.basename(path)
+        self.lbl_csv.config(text=f"Loaded: {fname} ({len(arr)} points)")
+
+    def _run_csv(self):
+        if self.estopped or self.waypoints is None:
+            return
+        # Travel to the first waypoint, then play back the planned segments
+        x0, z0 = self.waypoints[0]
+        self.mc.move_to(float(x0), float(z0))
+        self.mc.run_plan(self._plan_sx, self._plan_sz)
 
 if __name__ == "__main__":
     app = ManualControlApp()
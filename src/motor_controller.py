@@ -6,7 +6,12 @@ Abstracts stepper motor control for X and Z axes using Adafruit MotorKit.
 Supports stub mode when hardware libraries are unavailable.
 '''
 
+import array
+import functools
 import os
+import queue
+import threading
+import numpy as np
 import yaml
 import time
 
@@ -28,19 +33,79 @@ except ImportError:
         INTERLEAVE = "INTERLEAVE"
         MICROSTEP = "MICROSTEP"
 
+# smbus2 is optional: SyncXMotorController uses it to step both X motors
+# with a single I2C block write to the MotorKit's PCA9685
+try:
+    from smbus2 import SMBus, i2c_msg
+except ImportError:
+    SMBus = None
+
+# pigpio is optional: it drives hardware-timed (DMA) step trains on rigs
+# whose X axis is wired to a step/dir driver on the Pi's GPIO header
+try:
+    import pigpio
+except ImportError:
+    pigpio = None
+
+# Below this much remaining time (s) the pacer spins instead of sleeping,
+# since time.sleep() overshoots by about a millisecond on Linux
+SPIN_THRESHOLD = 0.001
+
+# pigpio waveforms are limited in length; longer moves are sent in chunks
+# of at most this many steps and this many seconds, so abort and the live
+# readout are never stuck behind one long wave
+MAX_WAVE_STEPS = 5000
+MAX_WAVE_SECONDS = 0.25
+
+# PCA9685 layout of the MotorKit stepper ports. Coil channels are in the
+# order MotorKit passes them to StepperMotor(ain1, ain2, bin1, bin2).
+_COIL_CHANNELS = {1: (10, 9, 11, 12), 2: (4, 3, 5, 6)}
+# Channels 3-12 cover both ports' coils plus two of their PWM enables,
+# which are kept fully on; one block write from LED3_ON_L updates them all
+_BLOCK_CHANNELS = range(3, 13)
+_ENABLE_CHANNELS = (7, 8)
+_LED0_ON_L = 0x06
+_FULL_ON = (0x00, 0x10, 0x00, 0x00)
+_FULL_OFF = (0x00, 0x00, 0x00, 0x10)
+
+# Axis indices into MotorController.position
+X, Z = 0, 1
+
+# Prefer the libyaml-backed loader when PyYAML was built with it
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+def _resolve_config_path(config_path=None):
+    """
+    Absolute path of the config file; defaults to config/config.yaml at the repo root.
+    """
+    if config_path is None:
+        here = os.path.dirname(__file__)
+        repo_root = os.path.abspath(os.path.join(here, os.pardir))
+        config_path = os.path.join(repo_root, "config", "config.yaml")
+    return os.path.abspath(config_path)
+
+@functools.lru_cache(maxsize=1)
+def _load_cfg(path):
+    """
+    Parse the YAML config once per path; later calls return the cached dict.
+    The result is shared, so callers must not mutate it.
+    """
+    with open(path, "r") as f:
+        return yaml.load(f, Loader=_YamlLoader)
+
 class MotorController:
     """
     High-level controller for two horizontal (X) and one vertical (Z) stepper motors.
     """
+    __slots__ = (
+        "step_style", "step_delay", "steps_per_mm_x", "steps_per_mm_z",
+        "kit", "steppers", "position", "_cmd_q", "updates",
+        "pi", "x_step_gpio", "x_dir_gpio", "_abort", "live_position",
+    )
+
     def __init__(self, config_path=None):
-        # Determine configuration file path
-        if config_path is None:
-            here = os.path.dirname(__file__)
-            repo_root = os.path.abspath(os.path.join(here, os.pardir))
-            config_path = os.path.join(repo_root, "config", "config.yaml")
         # Load configuration
-        with open(config_path, "r") as f:
-            cfg = yaml.safe_load(f)
+        cfg = _load_cfg(_resolve_config_path(config_path))
 
         # Setup stepping style and calibration
         self.step_style = getattr(Stepper, cfg.get("step_style", "SINGLE"))
@@ -56,9 +121,45 @@ class MotorController:
 
         # Create stepper objects (or placeholders)
         self._init_steppers(cfg.get("motors", {}))
+        self._init_step_gpio(cfg.get("step_gpio"))
 
-        # Track physical position in millimeters
-        self.position = {"x": 0.0, "z": 0.0}
+        # Track physical position in millimeters, indexed by X and Z
+        self.position = np.zeros(2, dtype=np.float64)
+        # Per-step mirror of position written by the worker mid-move, for
+        # the GUI to poll; single-slot array writes are atomic under the GIL
+        self.live_position = array.array("d", [0.0, 0.0])
+
+        # Motion runs on a background worker fed by a command queue so
+        # callers (e.g. the Tk mainloop) never block on the pulse loop.
+        # The worker reports back through `updates` as (kind, value) tuples.
+        self._cmd_q = queue.Queue()
+        self.updates = queue.Queue()
+        # Set by abort(); pulse loops check it before every step
+        self._abort = threading.Event()
+        threading.Thread(target=self._worker, daemon=True).start()
+
+    def set_position(self, x_mm, z_mm):
+        """
+        Queue an overwrite of the tracked position without moving (e.g. after
+        homing). Runs on the worker, after any moves already queued, so it
+        cannot race a running move's position updates.
+        """
+        self._cmd_q.put(("set", x_mm, z_mm))
+
+    def _run_set(self, x_mm, z_mm):
+        # live_position is resynced by the worker after every command
+        self.position[X] = x_mm
+        self.position[Z] = z_mm
+
+    @property
+    def x(self):
+        """Current X position in mm."""
+        return float(self.position[X])
+
+    @property
+    def z(self):
+        """Current Z position in mm."""
+        return float(self.position[Z])
 
     def _init_steppers(self, channels):
         """
@@ -73,75 +174,584 @@ class MotorController:
             else:
                 self.steppers[name] = None
 
-    def _step_motor(self, name, direction):
+    def _init_step_gpio(self, gpio_cfg):
         """
-        Step a single motor one microstep.
-        name: key in self.steppers; direction: Stepper.FORWARD/BACKWARD
+        Connect to the pigpio daemon when the config maps the X axis to
+        step/dir GPIO pins (BCM numbering). Leaves self.pi as None otherwise.
+        gpio_cfg: dict with keys 'x_step' and 'x_dir', or None.
+        """
+        self.pi = None
+        self.x_step_gpio = self.x_dir_gpio = None
+        if pigpio is None or not gpio_cfg:
+            return
+        pi = pigpio.pi()
+        if not pi.connected:
+            return
+        self.x_step_gpio = gpio_cfg["x_step"]
+        self.x_dir_gpio = gpio_cfg["x_dir"]
+        pi.set_mode(self.x_step_gpio, pigpio.OUTPUT)
+        pi.set_mode(self.x_dir_gpio, pigpio.OUTPUT)
+        self.pi = pi
+
+    def _make_pulse(self, name, direction):
+        """
+        Build a no-argument callable that steps one motor one microstep.
+        Stepper, style and direction are resolved here, once per move,
+        so pulse loops do no lookups per step.
         """
         stepper_obj = self.steppers.get(name)
         if REAL_HARDWARE and stepper_obj:
-            stepper_obj.onestep(style=self.step_style, direction=direction)
-        else:
-            print(f"[STUB] Step motor '{name}' dir={direction}")
+            onestep = stepper_obj.onestep
+            style = self.step_style
+            return lambda: onestep(style=style, direction=direction)
+        return lambda: print(f"[STUB] Step motor '{name}' dir={direction}")
+
+    def _make_x_pulse(self, direction):
+        """
+        Build a no-argument callable that steps both X motors one microstep.
+        """
+        pulse_l = self._make_pulse("x_left", direction)
+        pulse_r = self._make_pulse("x_right", direction)
+
+        def pulse_x():
+            pulse_l()
+            pulse_r()
+        return pulse_x
 
-    def _step_multiple(self, names, direction):
+    def _worker(self):
         """
-        Step multiple motors in sync, then delay.
-        names: list of motor name strings.
+        Pop commands off the queue and execute them one at a time.
+        Reports the new position (or the error) on `updates` after each command.
         """
-        for nm in names:
-            self._step_motor(nm, direction)
-        time.sleep(self.step_delay)
+        handlers = {
+            "x": self._run_x,
+            "z": self._run_z,
+            "x_raw": self._run_x_raw,
+            "x_hw": self._run_x_hw,
+            "z_raw": self._run_z_raw,
+            "to": self._run_to,
+            "plan": self._run_plan,
+            "motor": self._run_motor,
+            "release": self._release_all,
+            "set": self._run_set,
+        }
+        while True:
+            kind, *args = self._cmd_q.get()
+            try:
+                handlers[kind](*args)
+            except Exception as e:
+                report = ("error", f"{kind} move failed: {e}")
+            else:
+                report = ("position", (self.x, self.z))
+            # Resync the live mirror to the exact end-of-move position
+            self.live_position[X] = self.position[X]
+            self.live_position[Z] = self.position[Z]
+            self.updates.put(report)
+            self._cmd_q.task_done()
+
+    def wait(self):
+        """
+        Block until every queued move has finished.
+        """
+        self._cmd_q.join()
+
+    def busy(self):
+        """
+        True while a move is running or waiting in the queue.
+        """
+        return self._cmd_q.unfinished_tasks > 0
+
+    def cancel_pending(self):
+        """
+        Drop every queued move that has not started yet.
+        The move currently running (if any) is left to finish.
+        """
+        while True:
+            try:
+                self._cmd_q.get_nowait()
+            except queue.Empty:
+                return
+            self._cmd_q.task_done()
+
+    def abort(self):
+        """
+        Emergency stop: interrupt the running move before its next step,
+        drop everything queued, and de-energize all motors. Moves stay
+        blocked until clear_abort() is called.
+        """
+        self._abort.set()
+        self.cancel_pending()
+        # Release from the worker so it does not race the last pulse on the bus
+        self._cmd_q.put(("release",))
+
+    def clear_abort(self):
+        """
+        Re-allow moves after abort().
+        """
+        self._abort.clear()
+
+    @property
+    def aborted(self):
+        """True between abort() and clear_abort()."""
+        return self._abort.is_set()
+
+    def _release_all(self):
+        for stepper_obj in self.steppers.values():
+            if stepper_obj:
+                stepper_obj.release()
 
     def move_x(self, mm):
         """
-        Move both X-axis motors by mm (positive=right, negative=left).
+        Queue a move of both X-axis motors by mm (positive=right, negative=left).
         """
-        steps = int(round(mm * self.steps_per_mm_x))
-        if steps == 0:
+        self._cmd_q.put(("x", mm))
+
+    def move_x_hw(self, mm):
+        """
+        Queue an X move as a DMA-timed pigpio step train, using no CPU while
+        the pulses play out. Falls back to move_x() when pigpio is not set up.
+        """
+        if self.pi is None:
+            self.move_x(mm)
             return
-        direction = Stepper.FORWARD if steps > 0 else Stepper.BACKWARD
-        for _ in range(abs(steps)):
-            self._step_multiple(["x_left", "x_right"], direction)
-        self.position["x"] += mm
+        self._cmd_q.put(("x_hw", mm))
 
     def move_z(self, mm):
         """
-        Move Z-axis motor by mm (positive=up, negative=down).
+        Queue a move of the Z-axis motor by mm (positive=up, negative=down).
+        """
+        self._cmd_q.put(("z", mm))
+
+    def step_x_raw(self, steps):
+        """
+        Queue a move of both X-axis motors by a signed number of microsteps,
+        skipping the mm-to-steps conversion.
+        """
+        self._cmd_q.put(("x_raw", steps))
+
+    def step_z_raw(self, steps):
+        """
+        Queue a move of the Z-axis motor by a signed number of microsteps,
+        skipping the mm-to-steps conversion.
+        """
+        self._cmd_q.put(("z_raw", steps))
+
+    def move_to(self, x_mm, z_mm):
+        """
+        Queue a straight-line move to absolute (x_mm, z_mm).
         """
+        self._cmd_q.put(("to", x_mm, z_mm))
+
+    def run_plan(self, sx, sz):
+        """
+        Queue playback of a precomputed path from the current position.
+        sx, sz: equal-length integer arrays of signed X/Z microsteps per segment.
+        """
+        sx = np.asarray(sx, dtype=np.int64)
+        sz = np.asarray(sz, dtype=np.int64)
+        self._cmd_q.put(("plan", sx, sz))
+
+    def step_motor(self, name, steps):
+        """
+        Queue raw microsteps on a single motor (positive=FORWARD, negative=BACKWARD).
+        Does not change the tracked position.
+        """
+        self._cmd_q.put(("motor", name, steps))
+
+    def _run_motor(self, name, steps):
+        direction = Stepper.FORWARD if steps > 0 else Stepper.BACKWARD
+        pulse = self._make_pulse(name, direction)
+        aborted = self._abort.is_set
+        delay = self.step_delay
+        next_t = time.monotonic()
+        for _ in range(abs(steps)):
+            if aborted():
+                return
+            pulse()
+            next_t = _wait_until(next_t + delay)
+
+    def _run_x(self, mm):
+        steps = int(round(mm * self.steps_per_mm_x))
+        if steps == 0:
+            return
+        done = self._pulse_x(steps)
+        if done == abs(steps):
+            self.position[X] += mm
+        else:
+            self.position[X] += _signed(done, steps) / self.steps_per_mm_x
+
+    def _run_x_raw(self, steps):
+        done = self._pulse_x(steps)
+        self.position[X] += _signed(done, steps) / self.steps_per_mm_x
+
+    def _run_x_hw(self, mm):
+        steps = int(round(mm * self.steps_per_mm_x))
+        if steps == 0:
+            return
+        pi = self.pi
+        mask = 1 << self.x_step_gpio
+        half_us = max(1, int(self.step_delay * 1e6 / 2))
+        period_s = 2 * half_us / 1e6
+        wave_steps = max(1, min(MAX_WAVE_STEPS, int(MAX_WAVE_SECONDS / period_s)))
+        pi.write(self.x_dir_gpio, 1 if steps > 0 else 0)
+        aborted = self._abort.is_set
+        live = self.live_position
+        base = live[X]
+        inc = _signed(1, steps) / self.steps_per_mm_x
+        n = abs(steps)
+        done = 0
+        while done < n and not aborted():
+            chunk = min(n - done, wave_steps)
+            pi.wave_add_generic(
+                [pigpio.pulse(mask, 0, half_us), pigpio.pulse(0, mask, half_us)] * chunk
+            )
+            wid = pi.wave_create()
+            played = chunk
+            try:
+                pi.wave_send_once(wid)
+                start = time.monotonic()
+                while pi.wave_tx_busy():
+                    # The DMA engine does not report progress; infer the
+                    # steps played so far from the elapsed time
+                    played = min(chunk, int((time.monotonic() - start) / period_s))
+                    live[X] = base + (done + played) * inc
+                    if aborted():
+                        pi.wave_tx_stop()
+                        break
+                    time.sleep(0.005)
+                else:
+                    played = chunk
+            finally:
+                pi.wave_delete(wid)
+            done += played
+            live[X] = base + done * inc
+        if done == n:
+            self.position[X] += mm
+        else:
+            self.position[X] += _signed(done, steps) / self.steps_per_mm_x
+
+    def _run_z(self, mm):
         steps = int(round(mm * self.steps_per_mm_z))
         if steps == 0:
             return
+        done = self._pulse_z(steps)
+        if done == abs(steps):
+            self.position[Z] += mm
+        else:
+            self.position[Z] += _signed(done, steps) / self.steps_per_mm_z
+
+    def _run_z_raw(self, steps):
+        done = self._pulse_z(steps)
+        self.position[Z] += _signed(done, steps) / self.steps_per_mm_z
+
+    def _pulse_x(self, steps):
+        """
+        Step both X motors abs(steps) times. Returns how many steps were
+        taken, which is fewer than requested if the move was aborted.
+        """
         direction = Stepper.FORWARD if steps > 0 else Stepper.BACKWARD
-        for _ in range(abs(steps)):
-            self._step_multiple(["z_axis"], direction)
-        self.position["z"] += mm
+        # Hoist lookups out of the pulse loop
+        pulse_x = self._make_x_pulse(direction)
+        aborted = self._abort.is_set
+        live = self.live_position
+        pos = live[X]
+        inc = _signed(1, steps) / self.steps_per_mm_x
+        delay = self.step_delay
+        n = abs(steps)
+        next_t = time.monotonic()
+        for i in range(n):
+            if aborted():
+                return i
+            pulse_x()
+            pos += inc
+            live[X] = pos
+            next_t = _wait_until(next_t + delay)
+        return n
 
-    def move_to(self, x_mm, z_mm):
+    def _pulse_z(self, steps):
+        """
+        Step the Z motor abs(steps) times. Returns how many steps were taken.
+        """
+        direction = Stepper.FORWARD if steps > 0 else Stepper.BACKWARD
+        pulse_z = self._make_pulse("z_axis", direction)
+        aborted = self._abort.is_set
+        live = self.live_position
+        pos = live[Z]
+        inc = _signed(1, steps) / self.steps_per_mm_z
+        delay = self.step_delay
+        n = abs(steps)
+        next_t = time.monotonic()
+        for i in range(n):
+            if aborted():
+                return i
+            pulse_z()
+            pos += inc
+            live[Z] = pos
+            next_t = _wait_until(next_t + delay)
+        return n
+
+    def _run_to(self, x_mm, z_mm):
         """
-        Move from current (x,z) to target along straight path using Bresenham-like algorithm.
+        Move from current (x,z) to target along a straight path.
+        The X/Z step interleave is precomputed by _interleave().
         """
-        dx = x_mm - self.position["x"]
-        dz = z_mm - self.position["z"]
+        dx = x_mm - self.position[X]
+        dz = z_mm - self.position[Z]
         x_steps = int(round(dx * self.steps_per_mm_x))
         z_steps = int(round(dz * self.steps_per_mm_z))
+        schedule = _interleave(abs(x_steps), abs(z_steps))
+        _, done = self._run_segment(x_steps, z_steps, schedule, time.monotonic())
+
+        if done == len(schedule):
+            self.position[X] = x_mm
+            self.position[Z] = z_mm
+        else:
+            self._advance_partial(x_steps, z_steps, schedule, done)
+
+    def _run_plan(self, sx, sz):
+        # Position after each segment, integrated up front: shape (N, 2)
+        path = np.cumsum(
+            np.column_stack((sx / self.steps_per_mm_x, sz / self.steps_per_mm_z)), axis=0
+        )
+        path += self.position
+        # Pace continuously across segments so there is no gap at each waypoint.
+        # Each schedule is built just before its segment runs; the deadline
+        # pacer absorbs that time, and the caller's (Tk) thread never pays it.
+        next_t = time.monotonic()
+        for i, (x_steps, z_steps) in enumerate(zip(sx.tolist(), sz.tolist())):
+            schedule = _interleave(abs(x_steps), abs(z_steps))
+            next_t, done = self._run_segment(x_steps, z_steps, schedule, next_t)
+            if done < len(schedule):
+                self._advance_partial(x_steps, z_steps, schedule, done)
+                return
+            self.position[:] = path[i]
+
+    def _run_segment(self, x_steps, z_steps, schedule, next_t):
+        """
+        Pulse one straight segment of signed step counts along a precomputed
+        schedule (see _interleave). Returns the pacing deadline to continue
+        from and how many schedule entries ran (fewer if aborted).
+        """
         sx = Stepper.FORWARD if x_steps > 0 else Stepper.BACKWARD
         sz = Stepper.FORWARD if z_steps > 0 else Stepper.BACKWARD
-        x_steps = abs(x_steps)
-        z_steps = abs(z_steps)
-        err = x_steps - z_steps
-
-        x = z = 0
-        while x < x_steps or z < z_steps:
-            e2 = err * 2
-            if x < x_steps and e2 > -z_steps:
-                self._step_multiple(["x_left", "x_right"], sx)
-                err -= z_steps
-                x += 1
-            if z < z_steps and e2 < x_steps:
-                self._step_multiple(["z_axis"], sz)
-                err += x_steps
-                z += 1
-
-        self.position["x"] = x_mm
-        self.position["z"] = z_mm
+
+        pulse_x = self._make_x_pulse(sx)
+        pulse_z = self._make_pulse("z_axis", sz)
+        aborted = self._abort.is_set
+        live = self.live_position
+        x_pos, z_pos = live
+        x_inc = _signed(1, x_steps) / self.steps_per_mm_x
+        z_inc = _signed(1, z_steps) / self.steps_per_mm_z
+        delay = self.step_delay
+        for i, take_x in enumerate(schedule.tolist()):
+            if aborted():
+                return next_t, i
+            if take_x:
+                pulse_x()
+                x_pos += x_inc
+                live[X] = x_pos
+            else:
+                pulse_z()
+                z_pos += z_inc
+                live[Z] = z_pos
+            next_t = _wait_until(next_t + delay)
+        return next_t, len(schedule)
+
+    def _advance_partial(self, x_steps, z_steps, schedule, done):
+        # Credit only the steps of an interrupted segment that actually ran
+        x_done = int(np.count_nonzero(schedule[:done]))
+        self.position[X] += _signed(x_done, x_steps) / self.steps_per_mm_x
+        self.position[Z] += _signed(done - x_done, z_steps) / self.steps_per_mm_z
+
+def _signed(count, steps):
+    """Give a step count the sign of the requested move."""
+    return count if steps > 0 else -count
+
+def _interleave(x_steps, z_steps):
+    """
+    Build the step schedule for a straight X/Z move.
+    Returns a boolean array of length x_steps + z_steps; True means step X,
+    False means step Z.
+
+    Step k of an axis is due at time k / steps on a shared 0..1 timeline.
+    Scaling by x_steps * z_steps keeps the times integer; merging both axes'
+    events by time gives the order, with X first on ties.
+    """
+    n = x_steps + z_steps
+    events = np.empty(n, dtype=[("t", "i8"), ("axis", "u1")])
+    events["t"][:x_steps] = np.arange(1, x_steps + 1, dtype=np.int64) * z_steps
+    events["axis"][:x_steps] = X
+    events["t"][x_steps:] = np.arange(1, z_steps + 1, dtype=np.int64) * x_steps
+    events["axis"][x_steps:] = Z
+    events.sort(order=("t", "axis"))
+    return events["axis"] == X
+
+
+def _wait_until(deadline):
+    """
+    Pace a step loop against a monotonic deadline rather than sleeping a
+    fixed delay, so time spent pulsing does not stretch the step period.
+    Returns the time the next period should be measured from; if the loop
+    has fallen behind, that is now, so missed periods are not replayed as
+    a burst of back-to-back steps.
+    """
+    now = time.monotonic()
+    remaining = deadline - now
+    if remaining <= 0:
+        return now
+    if remaining > SPIN_THRESHOLD:
+        time.sleep(remaining - SPIN_THRESHOLD)
+    deadline_ns = int(deadline * 1e9)
+    while time.monotonic_ns() < deadline_ns:
+        pass
+    return deadline
+
+class _ProbePWM:
+    """Stand-in PWM output that only records the duty cycle written to it."""
+    frequency = 2000
+    duty_cycle = 0
+
+def _probe_phases(style, microsteps):
+    """
+    Derive the coil states and step deltas for `style` by driving an
+    Adafruit StepperMotor on stand-in outputs through onestep(), so a
+    fast path built from them energises coils exactly as onestep() would.
+
+    Phases are the 8 half-step positions (current microstep // half step,
+    mod 8). Returns (states, deltas), or None if some phase is not a plain
+    on/off pattern. states is an (8, 4) uint8 array in StepperMotor(ain1,
+    ain2, bin1, bin2) order; deltas maps FORWARD/BACKWARD to the signed
+    half-steps one onestep() moves from each phase.
+    """
+    def probe_at(phase):
+        pins = [_ProbePWM() for _ in range(4)]
+        motor = Stepper.StepperMotor(*pins, microsteps=microsteps)
+        for _ in range(phase):
+            motor.onestep(direction=Stepper.FORWARD, style=Stepper.INTERLEAVE)
+        return motor, pins
+
+    def read(pins):
+        duties = [p.duty_cycle for p in pins]
+        if any(d not in (0, 0xFFFF) for d in duties):
+            return None
+        return tuple(int(d == 0xFFFF) for d in duties)
+
+    states = [read(probe_at(phase)[1]) for phase in range(8)]
+    if None in states or len(set(states)) != 8:
+        return None
+    deltas = {}
+    for direction in (Stepper.FORWARD, Stepper.BACKWARD):
+        row = []
+        for phase in range(8):
+            motor, pins = probe_at(phase)
+            motor.onestep(direction=direction, style=style)
+            state = read(pins)
+            if state not in states:
+                return None
+            delta = (states.index(state) - phase) % 8
+            row.append(delta if direction == Stepper.FORWARD else delta - 8)
+        deltas[direction] = row
+    return np.array(states, dtype=np.uint8), deltas
+
+class SyncXMotorController(MotorController):
+    """
+    MotorController that steps both X motors with one I2C transaction
+    per pulse, instead of two separate Adafruit onestep() calls.
+
+    Only used for SINGLE, DOUBLE and INTERLEAVE styles, with the X motors
+    on MotorKit stepper ports 1 and 2 and smbus2 installed. Otherwise it
+    behaves exactly like MotorController. Coil states and phase steps are
+    derived from StepperMotor.onestep() (see _probe_phases). Each move
+    starts from x_left's current microstep and writes the new one back to
+    both X steppers, so onestep() carries on from the same coil state.
+    """
+    __slots__ = ("_bus", "_x_msgs", "_x_deltas", "_x_half", "_x_phase")
+
+    def __init__(self, config_path=None, i2c_bus=1, i2c_address=0x60):
+        super().__init__(config_path)
+        self._bus = None
+        self._x_msgs = None
+        self._x_deltas = None
+        self._x_half = None
+        self._x_phase = 0
+        cfg = _load_cfg(_resolve_config_path(config_path))
+        motors = cfg.get("motors", {})
+        ports = (motors.get("x_left"), motors.get("x_right"))
+        if not (REAL_HARDWARE and SMBus is not None and set(ports) == {1, 2}
+                and self.step_style in (Stepper.SINGLE, Stepper.DOUBLE, Stepper.INTERLEAVE)):
+            return
+        microsteps = self.steppers["x_left"]._microsteps
+        probed = _probe_phases(self.step_style, microsteps)
+        if probed is None:
+            return
+        states, self._x_deltas = probed
+        # Phase LUT of shape (8, 8): one row per half-step phase, the coil
+        # states of x_left then x_right
+        lut = np.tile(states, (1, 2))
+        channels = _COIL_CHANNELS[ports[0]] + _COIL_CHANNELS[ports[1]]
+        payloads = []
+        for row in lut.tolist():
+            on = set(_ENABLE_CHANNELS)
+            on.update(ch for ch, bit in zip(channels, row) if bit)
+            payload = [_LED0_ON_L + 4 * _BLOCK_CHANNELS[0]]
+            for ch in _BLOCK_CHANNELS:
+                payload.extend(_FULL_ON if ch in on else _FULL_OFF)
+            payloads.append(payload)
+        if not self._frames_match_onestep(payloads, ports, microsteps):
+            return
+        self._x_msgs = [i2c_msg.write(i2c_address, payload) for payload in payloads]
+        self._x_half = microsteps // 2
+        self._bus = SMBus(i2c_bus)
+
+    def _frames_match_onestep(self, payloads, ports, microsteps):
+        """
+        Replay onestep() on stand-in steppers wired like the MotorKit ports
+        and check every coil channel against the frames the fast path would
+        send, in both directions.
+        """
+        first = _BLOCK_CHANNELS[0]
+        for direction in (Stepper.FORWARD, Stepper.BACKWARD):
+            probes = []
+            for port in ports:
+                pins = {ch: _ProbePWM() for ch in _COIL_CHANNELS[port]}
+                motor = Stepper.StepperMotor(*pins.values(), microsteps=microsteps)
+                probes.append((motor, pins))
+            deltas = self._x_deltas[direction]
+            phase = 0
+            for _ in range(16):
+                phase += deltas[phase & 7]
+                payload = payloads[phase & 7]
+                for motor, pins in probes:
+                    motor.onestep(direction=direction, style=self.step_style)
+                    for ch, pin in pins.items():
+                        on = payload[1 + 4 * (ch - first) + 1] == _FULL_ON[1]
+                        if on != (pin.duty_cycle == 0xFFFF):
+                            return False
+        return True
+
+    def _make_x_pulse(self, direction):
+        if self._bus is None:
+            return super()._make_x_pulse(direction)
+        msgs = self._x_msgs
+        deltas = self._x_deltas[direction]
+        half = self._x_half
+        i2c_rdwr = self._bus.i2c_rdwr
+        xl = self.steppers["x_left"]
+        xr = self.steppers["x_right"]
+        # Start from the motor's real position. After MICROSTEP moves it can
+        # sit between half-steps; onestep() then first snaps onto the grid in
+        # the direction of travel, and for INTERLEAVE that snap is the whole step
+        phase, offset = divmod(xl._current_microstep, half)
+        if offset:
+            if direction == Stepper.FORWARD:
+                phase += 1
+            if self.step_style == Stepper.INTERLEAVE:
+                phase -= deltas[phase & 7]
+        self._x_phase = phase
+
+        def pulse_x():
+            phase = self._x_phase + deltas[self._x_phase & 7]
+            self._x_phase = phase
+            i2c_rdwr(msgs[phase & 7])
+            xl._current_microstep = xr._current_microstep = phase * half
+        return pulse_x
@@ -4,8 +4,7 @@ motor_test.py
 Interactive script to spin individual stepper motors for validation.
 Allows selecting a motor by name and issuing a specified number of microsteps.
 """
-import time
-from motor_controller import MotorController, Stepper
+from motor_controller import MotorController
 
 def main():
     mc = MotorController()
@@ -36,14 +35,16 @@ def main():
             print("Invalid step count. Enter an integer.")
             continue
 
-        direction = Stepper.FORWARD if steps > 0 else Stepper.BACKWARD
-        num_steps = abs(steps)
-
         print(f"Stepping motor '{motor_name}' {steps} steps...")
-        for _ in range(num_steps):
-            mc._step_motor(motor_name, direction)
-            time.sleep(mc.step_delay)
-        print(f"Completed {steps} steps on '{motor_name}'. Current position: X={mc.position['x']:.2f} mm, Z={mc.position['z']:.2f} mm\n")
+        # Runs on the controller's worker, which paces steps and resolves
+        # the motor's pulse callable once for the whole move
+        mc.step_motor(motor_name, steps)
+        mc.wait()
+        kind, value = mc.updates.get()
+        if kind == "error":
+            print(f"Error: {value}\n")
+            continue
+        print(f"Completed {steps} steps on '{motor_name}'. Current position: X={mc.x:.2f} mm, Z={mc.z:.2f} mm\n")
 
 if __name__ == "__main__":
     main()
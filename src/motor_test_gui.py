@@ -5,6 +5,7 @@ motor_test_gui.py
 GUI application to test individual stepper motors.
 Select a motor, specify step count, and move forward or backward.
 """
+import queue
 import tkinter as tk
 from tkinter import messagebox
 
@@ -49,6 +50,10 @@ class MotorTestGUI:
         self.status_var.set("Ready")
         tk.Label(master, textvariable=self.status_var).grid(row=3, column=0, columnspan=2, padx=5, pady=5)
 
+        # Pending status messages, one per queued move, shown as each completes
+        self._pending = []
+        master.after(20, self._drain_updates)
+
     def step_forward(self):
         self._step(Stepper.FORWARD)
 
@@ -62,9 +67,24 @@ class MotorTestGUI:
         except ValueError:
             messagebox.showerror("Invalid Input", "Please enter an integer step count.")
             return
-        for _ in range(abs(count)):
-            self.mc._step_multiple([motor], direction)
-        self.status_var.set(f"Moved {motor} {count} steps {'+' if direction==Stepper.FORWARD else '-'}")
+        # Stepping runs on the controller's worker thread
+        sign = 1 if direction == Stepper.FORWARD else -1
+        self.mc.step_motor(motor, sign * abs(count))
+        self._pending.append(f"Moved {motor} {count} steps {'+' if direction==Stepper.FORWARD else '-'}")
+        self.status_var.set(f"Moving {motor}...")
+
+    def _drain_updates(self):
+        try:
+            while True:
+                kind, value = self.mc.updates.get_nowait()
+                status = self._pending.pop(0) if self._pending else "Ready"
+                if kind == "error":
+                    messagebox.showerror("Error", value)
+                    status = "Error"
+                self.status_var.set(status)
+        except queue.Empty:
+            pass
+        self.master.after(20, self._drain_updates)
 
 if __name__ == "__main__":
     root = tk.Tk()